@@ -6,10 +6,10 @@ from matplotlib.animation import FuncAnimation
 import threading
 import time
 import psutil
-import pandas as pd
+import numpy as np
 from datetime import datetime
-from data_collection import ProcessDataCollector
-from data_processing import process_data, terminate_process, get_process_details
+from data_collection import ProcessDataCollector, STATE_TAGS
+from data_processing import process_data, select_rows, page_durations, terminate_process, get_process_details, TABLE_COLUMNS
 
 # Performance optimization: Pre-calculate CPU percent in background
 class CPUMonitor:
@@ -87,21 +87,24 @@ class ProcessMonitorDashboard:
         cpu_card = tk.Frame(summary_frame, bg="#1e1b4b", highlightbackground="#6366f1", highlightthickness=1)
         cpu_card.pack(side="left", padx=5, pady=5, ipadx=20, ipady=8)
         tk.Label(cpu_card, text="🖥️ CPU", font=("Segoe UI", 9), bg="#1e1b4b", fg="#a5b4fc").pack(anchor="w")
-        self.cpu_label = tk.Label(cpu_card, text="0%", font=("Segoe UI", 18, "bold"), bg="#1e1b4b", fg="#c7d2fe")
+        self.cpu_var = tk.StringVar(value="0%")
+        self.cpu_label = tk.Label(cpu_card, textvariable=self.cpu_var, font=("Segoe UI", 18, "bold"), bg="#1e1b4b", fg="#c7d2fe")
         self.cpu_label.pack(anchor="w")
         
         # Memory Card
         mem_card = tk.Frame(summary_frame, bg="#1e1b4b", highlightbackground="#6366f1", highlightthickness=1)
         mem_card.pack(side="left", padx=5, pady=5, ipadx=20, ipady=8)
         tk.Label(mem_card, text="💾 Memory", font=("Segoe UI", 9), bg="#1e1b4b", fg="#a5b4fc").pack(anchor="w")
-        self.memory_label = tk.Label(mem_card, text="0 GB / 0 GB (0%)", font=("Segoe UI", 14, "bold"), bg="#1e1b4b", fg="#c7d2fe")
+        self.memory_var = tk.StringVar(value="0 GB / 0 GB (0%)")
+        self.memory_label = tk.Label(mem_card, textvariable=self.memory_var, font=("Segoe UI", 14, "bold"), bg="#1e1b4b", fg="#c7d2fe")
         self.memory_label.pack(anchor="w")
         
         # Process Count Card
         proc_card = tk.Frame(summary_frame, bg="#1e1b4b", highlightbackground="#6366f1", highlightthickness=1)
         proc_card.pack(side="left", padx=5, pady=5, ipadx=20, ipady=8)
         tk.Label(proc_card, text="📊 Processes", font=("Segoe UI", 9), bg="#1e1b4b", fg="#a5b4fc").pack(anchor="w")
-        self.process_count_label = tk.Label(proc_card, text="0", font=("Segoe UI", 18, "bold"), bg="#1e1b4b", fg="#c7d2fe")
+        self.process_count_var = tk.StringVar(value="0")
+        self.process_count_label = tk.Label(proc_card, textvariable=self.process_count_var, font=("Segoe UI", 18, "bold"), bg="#1e1b4b", fg="#c7d2fe")
         self.process_count_label.pack(anchor="w")
 
         # Modern search bar
@@ -142,6 +145,11 @@ class ProcessMonitorDashboard:
         self.tree.focus_set()
         self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
 
+        # Row state tags (configured once, reused on every refresh)
+        self.tree.tag_configure("running", background="#166534", foreground="#bbf7d0")
+        self.tree.tag_configure("stopped", background="#c2410c", foreground="#ffedd5")
+        self.tree.tag_configure("other", background="#854d0e", foreground="#fef08a")
+
         # Pagination controls
         pagination_frame = tk.Frame(root, bg="#0a0a0f")
         pagination_frame.pack(fill="x", padx=15, pady=5)
@@ -181,29 +189,39 @@ class ProcessMonitorDashboard:
         self.ax1.set_title("CPU Usage (%)", color="#c7d2fe", fontsize=11, fontweight='bold')
         self.ax2.set_title("Memory Usage (%)", color="#c7d2fe", fontsize=11, fontweight='bold')
         
-        # Pre-create line objects for efficient updates (avoid full redraws)
-        self.cpu_data = [0] * 60
-        self.memory_data = [0] * 60
-        self.cpu_line, = self.ax1.plot(self.cpu_data, color="#818cf8", linewidth=2)
-        self.mem_line, = self.ax2.plot(self.memory_data, color="#fbbf24", linewidth=2)
+        # Pre-create line objects for efficient updates (avoid full redraws).
+        # Lines are animated so full draws leave them out of the cached background.
+        self.cpu_data = np.zeros(60, dtype=np.float32)
+        self.memory_data = np.zeros(60, dtype=np.float32)
+        self.cpu_line, = self.ax1.plot(self.cpu_data, color="#818cf8", linewidth=2, animated=True)
+        self.mem_line, = self.ax2.plot(self.memory_data, color="#fbbf24", linewidth=2, animated=True)
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=graph_frame)
         self.canvas.get_tk_widget().pack()
-        self.canvas.draw()  # Initial draw
-        
-        # Cache background for blitting optimization
+
+        # Cache background for blitting optimization (refreshed after every full draw, e.g. resize)
         self.graph_bg = None
+        self.canvas.mpl_connect('draw_event', self.on_graph_draw)
+        self.canvas.draw()  # Initial draw
 
         # Modern status bar
         status_frame = tk.Frame(root, bg="#1e1b4b")
         status_frame.pack(fill="x", padx=15, pady=(5, 10))
-        self.status_bar = tk.Label(status_frame, text="⏱️ Last Updated: Not yet updated", font=("Segoe UI", 10), bg="#1e1b4b", fg="#a5b4fc", anchor="w")
+        self.status_var = tk.StringVar(value="⏱️ Last Updated: Not yet updated")
+        self.status_bar = tk.Label(status_frame, textvariable=self.status_var, font=("Segoe UI", 10), bg="#1e1b4b", fg="#a5b4fc", anchor="w")
         self.status_bar.pack(fill="x", padx=10, pady=5)
 
         # Initialize process data
         self.collector = ProcessDataCollector()
-        self.all_processes = pd.DataFrame()
-        self.filtered_processes = pd.DataFrame()
+        self.all_processes = process_data(None)  # dict of column arrays
+        self.filtered_processes = self.all_processes
+        self._names_lower = None  # lowercased names of _names_source, built on first search
+        self._names_source = None
+        self._filtered_names = None
+        self._last_search_term = ""
+        self._filtered_source = self.all_processes  # snapshot the current filter was computed from
+        self._iid_by_pid = {}  # PID -> Treeview item currently on screen
+        self._values_by_pid = {}  # PID -> last values tuple shown for that row
         self.search_after_id = None
         self.last_graph_update = 0
         self.current_page = 0
@@ -211,12 +229,14 @@ class ProcessMonitorDashboard:
         self.last_update_time = 0
         self.update_interval = 3  # Increased from 2 to 3 seconds for better performance
         self.selected_pid = None
+        self._min_redraw_interval = 0.5  # Cap UI-triggered refreshes at 2 per second
+        self._last_redraw_ts = 0.0
 
-        # Start real-time updates
+        # Start real-time updates: the collector scans in its own thread at the UI's cadence,
+        # and the Tk thread only picks up the published snapshot
         self.running = True
-        self.update_thread = threading.Thread(target=self.update_data_loop)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+        self.collector.start(interval=self.update_interval)
+        self.root.after(100, self.schedule_update)
 
     def on_tree_select(self, event):
         selected = self.tree.selection()
@@ -228,97 +248,150 @@ class ProcessMonitorDashboard:
             self.selected_pid = None
             print("No selection")
 
-    def update_data_loop(self):
-        while self.running:
-            self.root.after(0, self.update_data_once)
-            time.sleep(self.update_interval)  # Use configurable interval
+    def schedule_update(self):
+        """Tk-side timer: apply the collector's latest snapshot every update_interval seconds"""
+        if not self.running:
+            return
+        try:
+            self.apply_snapshot(*self.collect_snapshot())
+        except Exception as e:
+            self.status_var.set(f"⚠️ Error: {str(e)[:50]}")
+        self.root.after(int(self.update_interval * 1000), self.schedule_update)
+
+    def collect_snapshot(self):
+        """Gather process data and system stats; the collector's loop has already done the scan"""
+        raw_data = self.collector.get_process_data()
+        processes = process_data(raw_data)
+
+        # Update system summary using NON-BLOCKING CPU monitor
+        total_cpu = self.cpu_monitor.get_cpu_percent()  # No blocking!
+        memory = psutil.virtual_memory()
+        return processes, total_cpu, memory
 
     def update_data_once(self):
+        """Synchronous refresh used by the action buttons (rate-limited)"""
+        now = time.monotonic()
+        if now - self._last_redraw_ts < self._min_redraw_interval:
+            return
+        self._last_redraw_ts = now
         try:
-            self.status_bar.config(text="⏳ Updating...")
-            raw_data = self.collector.get_process_data()
-            df = process_data(raw_data)
+            self.status_var.set("⏳ Updating...")
+            self.apply_snapshot(*self.collect_snapshot())
+        except Exception as e:
+            # Avoid showing error dialogs during normal operation
+            self.status_var.set(f"⚠️ Error: {str(e)[:50]}")
 
-            # Update system summary using NON-BLOCKING CPU monitor
-            total_cpu = self.cpu_monitor.get_cpu_percent()  # No blocking!
-            memory = psutil.virtual_memory()
+    def apply_snapshot(self, processes, total_cpu, memory):
+        try:
             total_memory_percent = memory.percent
             used_memory_gb = memory.used / (1024 ** 3)
             total_memory_gb = memory.total / (1024 ** 3)
             
             # Update labels with better formatting
-            self.cpu_label.config(text=f"{total_cpu:.1f}%")
-            self.memory_label.config(text=f"{used_memory_gb:.1f} / {total_memory_gb:.1f} GB ({total_memory_percent}%)")
-            self.process_count_label.config(text=str(len(df)))
+            self.cpu_var.set(f"{total_cpu:.1f}%")
+            self.memory_var.set(f"{used_memory_gb:.1f} / {total_memory_gb:.1f} GB ({total_memory_percent}%)")
+            self.process_count_var.set(str(len(processes['pid'])))
 
             # Preserve selection
             selected_pid = self.selected_pid
-            self.all_processes = df
+            self.all_processes = processes
 
             # Apply search filter
-            search_term = self.search_var.get().strip().lower()
-            if search_term:
-                self.filtered_processes = self.all_processes[self.all_processes['name'].str.lower().str.contains(search_term, na=False)]
-            else:
-                self.filtered_processes = self.all_processes
+            self.apply_filter()
 
             # Update table
             self.update_table()
 
             # OPTIMIZED: Update graphs using line data update instead of full redraw
-            current_time = time.time()
+            current_time = time.monotonic()
             if current_time - self.last_graph_update >= 3:
-                # Shift data left and add new value (circular buffer approach)
-                self.cpu_data.pop(0)
-                self.cpu_data.append(total_cpu)
-                self.memory_data.pop(0)
-                self.memory_data.append(total_memory_percent)
+                # Shift data left in place and add new value (single memmove per buffer)
+                self.cpu_data[:-1] = self.cpu_data[1:]
+                self.cpu_data[-1] = total_cpu
+                self.memory_data[:-1] = self.memory_data[1:]
+                self.memory_data[-1] = total_memory_percent
 
                 # Update line data only (much faster than clearing and replotting)
                 self.cpu_line.set_ydata(self.cpu_data)
                 self.mem_line.set_ydata(self.memory_data)
                 
-                # Efficient canvas update
-                self.canvas.draw_idle()  # draw_idle is more efficient than draw()
+                # Blit only the two lines over the cached axes backgrounds
+                self.blit_graphs()
                 self.last_graph_update = current_time
 
-            self.status_bar.config(text=f"✅ Last Updated: {datetime.now().strftime('%H:%M:%S')}")
+            self.status_var.set("✅ Last Updated: " + time.strftime('%H:%M:%S'))
         except Exception as e:
             # Avoid showing error dialogs during normal operation
-            self.status_bar.config(text=f"⚠️ Error: {str(e)[:50]}")
+            self.status_var.set(f"⚠️ Error: {str(e)[:50]}")
+
+    def on_graph_draw(self, event):
+        """Re-cache axes backgrounds after a full draw and paint the animated lines on top"""
+        self.graph_bg = (self.canvas.copy_from_bbox(self.ax1.bbox), self.canvas.copy_from_bbox(self.ax2.bbox))
+        self.ax1.draw_artist(self.cpu_line)
+        self.ax2.draw_artist(self.mem_line)
+
+    def blit_graphs(self):
+        if self.graph_bg is None:
+            self.canvas.draw_idle()
+            return
+        cpu_bg, mem_bg = self.graph_bg
+        self.canvas.restore_region(cpu_bg)
+        self.ax1.draw_artist(self.cpu_line)
+        self.canvas.blit(self.ax1.bbox)
+        self.canvas.restore_region(mem_bg)
+        self.ax2.draw_artist(self.mem_line)
+        self.canvas.blit(self.ax2.bbox)
 
     def update_table(self):
         """Optimized table update with minimal widget operations"""
         selected_pid = self.selected_pid
-        
-        # Batch delete for better performance
-        children = self.tree.get_children()
-        if children:
-            self.tree.delete(*children)
 
         start_idx = self.current_page * self.processes_per_page
         end_idx = start_idx + self.processes_per_page
-        page_data = self.filtered_processes.iloc[start_idx:end_idx]
-
-        # Configure tags once (not every update)
-        self.tree.tag_configure("running", background="#166534", foreground="#bbf7d0")
-        self.tree.tag_configure("stopped", background="#c2410c", foreground="#ffedd5")
-        self.tree.tag_configure("other", background="#854d0e", foreground="#fef08a")
-
-        # Batch insert with values
-        for _, row in page_data.iterrows():
-            state = row['state']
-            tag = "running" if state == "running" else "stopped" if state == "stopped" else "other"
-            self.tree.insert('', 'end', values=(row['pid'], row['name'], state, row['cpu_percent'], row['memory_mb'], row['duration']), tags=(tag,))
+        # Durations are only formatted for the rows on this page
+        page_data = page_durations(select_rows(self.filtered_processes, slice(start_idx, end_idx)))
+
+        # Vectorized row/tag preparation: plain Python values straight from the columns
+        rows = list(zip(*(page_data[column].tolist() for column in TABLE_COLUMNS)))
+        tags = [STATE_TAGS[code] for code in page_data['state_code'].tolist()]
+
+        # Diff against the rows already shown: only touch PIDs that changed
+        old_iids = self._iid_by_pid
+        old_values = self._values_by_pid
+        new_pids = {vals[0] for vals in rows}
+        stale = [iid for pid, iid in old_iids.items() if pid not in new_pids]
+        if stale:
+            self.tree.delete(*stale)
+
+        # Surviving rows keep their relative order unless the sort order changed
+        kept_old = [pid for pid in old_iids if pid in new_pids]
+        kept_new = [vals[0] for vals in rows if vals[0] in old_iids]
+        reorder = kept_old != kept_new
+
+        iid_by_pid = {}
+        values_by_pid = {}
+        for index, (vals, tag) in enumerate(zip(rows, tags)):
+            pid = vals[0]
+            item = old_iids.get(pid)
+            if item is None:
+                item = self.tree.insert('', index, values=vals, tags=(tag,))
+            else:
+                if old_values[pid] != vals:
+                    self.tree.item(item, values=vals, tags=(tag,))
+                if reorder:
+                    self.tree.move(item, '', index)
+            iid_by_pid[pid] = item
+            values_by_pid[pid] = vals
+        self._iid_by_pid = iid_by_pid
+        self._values_by_pid = values_by_pid
 
         # Restore selection
         if selected_pid:
-            for item in self.tree.get_children():
-                if int(self.tree.item(item)['values'][0]) == selected_pid:
-                    self.tree.selection_set(item)
-                    break
+            item = iid_by_pid.get(selected_pid)
+            if item is not None:
+                self.tree.selection_set(item)
 
-        total_pages = max(1, (len(self.filtered_processes) + self.processes_per_page - 1) // self.processes_per_page)
+        total_pages = max(1, (len(self.filtered_processes['pid']) + self.processes_per_page - 1) // self.processes_per_page)
         self.page_var.set(f"Page {self.current_page + 1} of {total_pages}")
 
     def prev_page(self):
@@ -327,7 +400,7 @@ class ProcessMonitorDashboard:
             self.update_table()
 
     def next_page(self):
-        total_pages = (len(self.filtered_processes) + self.processes_per_page - 1) // self.processes_per_page
+        total_pages = (len(self.filtered_processes['pid']) + self.processes_per_page - 1) // self.processes_per_page
         if self.current_page < total_pages - 1:
             self.current_page += 1
             self.update_table()
@@ -335,33 +408,59 @@ class ProcessMonitorDashboard:
     def debounce_search(self, *args):
         if self.search_after_id is not None:
             self.root.after_cancel(self.search_after_id)
-        self.search_after_id = self.root.after(300, self.search_processes)
+        # Wait a little longer between keystrokes on very large process lists
+        delay = 400 if len(self.all_processes['pid']) > 2000 else 300
+        self.search_after_id = self.root.after(delay, self.search_processes)
+
+    def apply_filter(self):
+        """Filter all_processes by the search box text; returns False if nothing changed"""
+        search_term = self.search_var.get().strip().lower()
+        same_source = self.all_processes is self._filtered_source
+        if same_source and search_term == self._last_search_term:
+            return False
+        if not search_term:
+            self.filtered_processes = self.all_processes
+            self._filtered_names = None
+        else:
+            # A term containing the previous one can only match a subset of its matches
+            if same_source and self._last_search_term and self._last_search_term in search_term:
+                base, names = self.filtered_processes, self._filtered_names
+            else:
+                base, names = self.all_processes, self.lowercase_names()
+            mask = np.char.find(names, search_term) >= 0
+            self.filtered_processes = select_rows(base, mask)
+            self._filtered_names = names[mask]
+        if search_term != self._last_search_term:
+            # A new term starts from the first page, whichever caller applied it
+            self.current_page = 0
+        self._last_search_term = search_term
+        self._filtered_source = self.all_processes
+        return True
+
+    def lowercase_names(self):
+        """Lowercased names of all_processes: built once per snapshot, and only when a search needs them"""
+        if self._names_source is not self.all_processes:
+            self._names_lower = np.char.lower(self.all_processes['name'].astype(str))
+            self._names_source = self.all_processes
+        return self._names_lower
 
     def search_processes(self):
         try:
-            self.current_page = 0
-            search_term = self.search_var.get().strip().lower()
-            if not search_term:
-                self.filtered_processes = self.all_processes
-            else:
-                self.filtered_processes = self.all_processes[self.all_processes['name'].str.lower().str.contains(search_term, na=False)]
-            self.update_table()
+            if self.apply_filter():
+                self.update_table()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to search processes: {str(e)}")
 
     def clear_search(self):
         self.search_var.set("")
+        self.apply_filter()
         self.current_page = 0
-        self.filtered_processes = self.all_processes
         self.update_table()
 
     def refresh_now(self):
         print("Refresh Now button clicked")
-        try:
-            self.update_data_once()
-            messagebox.showinfo("Success", "Data refreshed successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to refresh data: {str(e)}")
+        # Progress and errors are reported in the status bar, no modal dialog
+        self.update_data_once()
 
     def terminate_selected(self):
         print("Terminate Process button clicked")
@@ -420,7 +519,7 @@ class ProcessMonitorDashboard:
     def on_closing(self):
         self.running = False
         self.cpu_monitor.stop()  # Stop the CPU monitor thread
-        self.update_thread.join(timeout=2)  # Don't wait forever
+        self.collector.close()  # Stop its loop and release cached /proc descriptors (waits for an in-flight pass)
         plt.close(self.fig)  # Clean up matplotlib resources
         self.root.destroy()
 
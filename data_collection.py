@@ -1,155 +1,396 @@
+import os
+import sys
 import psutil
+import numpy as np
 import time
 import subprocess
-from threading import Thread, Lock
+import csv
+import io
+from threading import Thread, Lock, Event
+
+IS_LINUX = sys.platform.startswith('linux')
+
+# Single-letter states from /proc/<pid>/stat, named like psutil's status strings
+LINUX_PROC_STATES = {
+    b'R': "running",
+    b'S': "sleeping",
+    b'D': "disk-sleep",
+    b'T': "stopped",
+    b't': "tracing-stop",
+    b'Z': "zombie",
+    b'X': "dead",
+    b'x': "dead",
+    b'K': "wake-kill",
+    b'W': "waking",
+    b'I': "idle",
+    b'P': "parked",
+}
+
+# Row tags used by the dashboard; a snapshot's state_code column indexes into this tuple
+STATE_TAGS = ('running', 'stopped', 'other')
+
+def build_columns(pids, names, states, cpu_percents, rss_bytes, start_times):
+    """Pack the per-process lists gathered by a collection pass into column arrays."""
+    states = np.array(states, dtype=object)
+    cpu_percents = np.array(cpu_percents, dtype=np.float64)
+    np.round(cpu_percents, 2, out=cpu_percents)  # rounded in place for display
+    # Bytes -> MB: scaling by 2**-20 is exact in float64, then rounded in place like CPU%
+    memory_mb = np.array(rss_bytes, dtype=np.float64)
+    memory_mb *= 1 / (1 << 20)
+    np.round(memory_mb, 2, out=memory_mb)
+    return {
+        'pid': np.array(pids, dtype=np.int32),
+        'name': np.array(names, dtype=object),
+        'state': states,
+        'state_code': np.where(states == 'running', 0, np.where(states == 'stopped', 1, 2)).astype(np.int8),
+        # Displayed values stay float64: float32 would show up as 12.649999618530273 in the table
+        'cpu_percent': cpu_percents,
+        'memory_mb': memory_mb,
+        'start_time': np.array(start_times, dtype=np.float64),
+    }
 
 class ProcessDataCollector:
     """
     Optimized process data collector with non-blocking updates and smart caching.
+    Snapshots are column-oriented: a dict of numpy arrays keyed by
+    pid, name, state, state_code, cpu_percent, memory_mb and start_time.
     """
     def __init__(self):
-        self.last_cpu_update = 0
-        self.last_full_update = 0
-        self.cpu_data_cache = {}
-        self.name_cache = {}
-        self.processes = []
-        self.is_collecting = False
-        self._lock = Lock()
-        self._cached_result = []
-        self._cache_timestamp = 0
+        # pid -> (user + system CPU time, monotonic sample time); ticks on Linux. Reset for a reused PID
+        self._prev_cpu_times = {}
+        self._ncpu = psutil.cpu_count() or 1
+        if IS_LINUX:
+            self._clk_tck = os.sysconf('SC_CLK_TCK')
+            self._page_size = os.sysconf('SC_PAGE_SIZE')
+            self._boot_time = psutil.boot_time()
+            # Open /proc/<pid>/stat descriptors kept across passes and re-read with pread
+            self._stat_fds = {}
+            self._max_stat_fds = 512
+        self._pid_meta_cache = {}  # pid -> (identity, name, create_time): resolved once per process, names interned
+        self._procs = {}  # pid -> psutil.Process reused across passes (non-Linux path)
+        # Published (monotonic timestamp, columns) pair, replaced atomically by each pass
+        self._snapshot = (0, None)
+        # Serializes passes (they share the per-PID caches and /proc descriptors); readers only try-acquire it
+        self._collect_lock = Lock()
         self._cache_ttl = 1.5  # Cache valid for 1.5 seconds
+        self._last_reap = 0
+        self._reap_interval = 60  # Seconds between stale-entry cleanups
+        # Background collection loop (see start); not running until started
+        self._thread = None
+        self._stop_event = Event()
+        self._closed = False  # Set by close(); no pass runs afterwards
+        self._snapshot_read = Event()  # Set by readers; the loop only scans again once it is set
+
+    def start(self, interval=None):
+        """
+        Collect on a daemon thread every `interval` seconds (default: the cache TTL),
+        skipping passes while nobody has read the previous snapshot.
+        While it runs, get_process_data only reads the published snapshot.
+        """
+        if self._thread is not None:
+            return
+        # Each loop gets its own stop event, so a stopped loop can never be revived by a restart
+        self._stop_event = Event()
+        self._thread = Thread(target=self._run_loop, args=(interval or self._cache_ttl, self._stop_event), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background loop; an in-flight pass still finishes."""
+        self._stop_event.set()
+        self._snapshot_read.set()  # Wake a loop waiting for a reader
+        # get_process_data goes back to collecting on demand; start() may run a new loop
+        self._thread = None
+
+    def _run_loop(self, interval, stop_event):
+        while not stop_event.is_set():
+            with self._collect_lock:
+                # Re-checked under the lock so no pass starts after close()
+                if stop_event.is_set():
+                    break
+                self._snapshot_read.clear()
+                try:
+                    self._collect_data()
+                except Exception:
+                    pass  # Keep the last good snapshot published
+            stop_event.wait(interval)
+            # A snapshot nobody picked up would be scanned for nothing: wait for a reader
+            self._snapshot_read.wait()
+
+    def close(self):
+        """Stop collecting for good and release the /proc descriptors held by the Linux fast path."""
+        self.stop()
+        with self._collect_lock:
+            self._closed = True
+            if IS_LINUX:
+                for fd in self._stat_fds.values():
+                    os.close(fd)
+                self._stat_fds.clear()
 
     def get_process_data(self):
         """
         Returns process data, using cache if available and fresh.
         Non-blocking: returns cached data if collection in progress.
+        With the background loop running this is a single attribute read.
+        Only the very first call may wait, until the first snapshot exists.
         """
-        current_time = time.time()
-        
-        # Return cached data if fresh enough (avoids redundant collection)
-        if self._cached_result and (current_time - self._cache_timestamp) < self._cache_ttl:
-            return self._cached_result
+        timestamp, processes = self._snapshot
+        if not self._snapshot_read.is_set():
+            self._snapshot_read.set()
+
+        if processes is None:
+            # Nothing published yet: wait for the first pass (or run it) rather than return no processes
+            with self._collect_lock:
+                if self._snapshot[1] is None:
+                    self._collect_data()
+            return self._snapshot[1]
         
-        # If already collecting, return last known data (non-blocking!)
-        if self.is_collecting:
-            return self._cached_result if self._cached_result else self.processes
+        # The loop keeps the snapshot current; otherwise return cached data if fresh enough
+        if self._thread is not None or (time.monotonic() - timestamp) < self._cache_ttl:
+            return processes
         
-        # Collect synchronously but efficiently
-        self._collect_data()
-        return self.processes
+        # If another thread is already collecting, return last known data (non-blocking!)
+        if self._collect_lock.acquire(blocking=False):
+            try:
+                self._collect_data()
+            finally:
+                self._collect_lock.release()
+        return self._snapshot[1]
 
     def _collect_data(self):
-        """Collect process data with optimizations for performance."""
-        with self._lock:
-            if self.is_collecting:
-                return
-            self.is_collecting = True
+        """Collect process data with optimizations for performance (caller holds _collect_lock)."""
+        if self._closed:
+            return  # Keep the last snapshot; a pass now would reopen released descriptors
+        # Monotonic so clock jumps cannot skew the TTL, reaper or CPU% deltas; start times stay wall-clock
+        current_time = time.monotonic()
+        if IS_LINUX:
+            processes = self._collect_data_linux(current_time)
+        else:
+            processes = self._collect_data_psutil(current_time)
+
+        # Publish with a single attribute store so readers never see a torn snapshot
+        self._snapshot = (current_time, processes)
         
-        try:
-            processes = []
-            current_time = time.time()
-            
-            # Update CPU data every 5 seconds (as before)
-            update_cpu = (current_time - self.last_cpu_update) >= 5
-            
-            # Use oneshot context manager for efficiency (reduces syscalls)
-            for proc in psutil.process_iter(['pid', 'name', 'status', 'memory_info', 'create_time']):
-                try:
-                    with proc.oneshot():
-                        # Use defaults for missing attributes (fixes AccessDenied issues)
-                        pid = proc.pid
-                        info = proc.info
-                        
+        # Periodically drop per-PID state of exited processes in place (one PID set for all caches)
+        if current_time - self._last_reap >= self._reap_interval:
+            self._last_reap = current_time
+            active_pids = set(processes['pid'].tolist())
+            for cache in (self._prev_cpu_times, self._pid_meta_cache, self._procs):
+                for pid in cache.keys() - active_pids:
+                    del cache[pid]
+            if IS_LINUX:
+                for pid in self._stat_fds.keys() - active_pids:
+                    os.close(self._stat_fds.pop(pid))
+
+    def _collect_data_psutil(self, current_time):
+        """Portable collection path based on psutil."""
+        pids, names, states, cpu_percents, rss_bytes, start_times = [], [], [], [], [], []
+        prev_cpu_times = self._prev_cpu_times
+        ncpu = self._ncpu
+        pid_meta = self._pid_meta_cache
+        unresolved = set()  # new PIDs psutil could not name
+
+        # Own PID -> Process map: skips process_iter's per-PID is_running() check on older psutil
+        procs = self._procs
+        current = psutil.pids()
+        # Drop gone PIDs every pass so a reused PID gets a fresh Process object
+        for pid in procs.keys() - set(current):
+            del procs[pid]
+        for pid in current:
+            try:
+                proc = procs.get(pid)
+                if proc is None:
+                    proc = procs[pid] = psutil.Process(pid)
+                # One oneshot() read per process, straight into the column lists
+                with proc.oneshot():
+                    # The Process object identifies the process: a new one means a new process
+                    meta = pid_meta.get(pid)
+                    if meta is not None and meta[0] is proc:
+                        name, create_time = meta[1], meta[2]
+                    else:
+                        prev_cpu_times.pop(pid, None)
                         # Robust name retrieval
-                        name = info.get('name')
-                        if not name:
-                            try:
-                                name = proc.name()
-                            except (psutil.AccessDenied, psutil.ZombieProcess):
-                                name = "Access Denied" if psutil.pid_exists(pid) else "Terminated"
-                            except Exception:
-                                name = "Unknown"
-                        
+                        try:
+                            name = proc.name()
+                        except (psutil.AccessDenied, psutil.ZombieProcess):
+                            name = "Access Denied" if psutil.pid_exists(pid) else "Terminated"
+                        except Exception:
+                            name = "Unknown"
+
                         if not name or name == "Unknown":
-                            # Attempt expensive fallback (cached) for persistent system processes
-                            if pid in self.name_cache:
-                                name = self.name_cache[pid]
-                            else:
-                                try:
-                                    # Fallback to tasklist for stubborn Windows processes (e.g. Secure System)
-                                    # Use a list for command arguments to handle spaces correctly and safely
-                                    cmd = ['tasklist', '/FI', f'PID eq {pid}', '/NH', '/FO', 'CSV']
-                                    # usage of creationflags=0x08000000 (CREATE_NO_WINDOW) prevents console window flash
-                                    output = subprocess.check_output(cmd, creationflags=0x08000000).decode(errors='ignore')
-                                    if output.strip():
-                                        parts = output.split('","')
-                                        if len(parts) > 0:
-                                            found = parts[0].strip('"')
-                                            self.name_cache[pid] = found
-                                            name = found
-                                except Exception:
-                                    self.name_cache[pid] = "Unknown"
-                        
-                        if not name:
+                            # Resolved after the loop with a single tasklist call
                             name = "Unknown"
-                        
-                        # Robust state retrieval
-                        state = info.get('status')
-                        if not state:
-                            try:
-                                state = proc.status()
-                            except Exception:
-                                state = "unknown"
-
-                        # Robust memory retrieval (don't skip if denied)
-                        mem_info = info.get('memory_info')
-                        memory_mb = 0.0
-                        if mem_info:
-                            memory_mb = mem_info.rss / (1024 * 1024)
-                        
+                            unresolved.add(pid)
+
                         # Robust start time
-                        create_time = info.get('create_time', 0)
-                            
-                        process_info = {
-                            'pid': pid,
-                            'name': name,
-                            'state': state,
-                            'cpu_percent': 0.0,
-                            'memory_mb': memory_mb,
-                            'start_time': create_time
-                        }
-                        
-                        if update_cpu:
-                            try:
-                                process_info['cpu_percent'] = proc.cpu_percent(interval=None) or 0.0
-                                self.cpu_data_cache[pid] = process_info['cpu_percent']
-                            except Exception:
-                                process_info['cpu_percent'] = self.cpu_data_cache.get(pid, 0.0)
-                        else:
-                            process_info['cpu_percent'] = self.cpu_data_cache.get(pid, 0.0)
-                        
-                        processes.append(process_info)
-                        
-                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                        try:
+                            create_time = proc.create_time()
+                        except psutil.AccessDenied:
+                            create_time = 0
+                        name = sys.intern(name)
+                        pid_meta[pid] = (proc, name, create_time)
+
+                    # Robust state retrieval
+                    try:
+                        state = proc.status() or "unknown"
+                    except (psutil.AccessDenied, psutil.ZombieProcess):
+                        state = "unknown"
+
+                    # Robust memory retrieval (don't skip if denied)
+                    try:
+                        rss = proc.memory_info().rss
+                    except (psutil.AccessDenied, psutil.ZombieProcess):
+                        rss = 0
+
+                    try:
+                        cpu_times = proc.cpu_times()
+                    except (psutil.AccessDenied, psutil.ZombieProcess):
+                        cpu_times = None
+
+                # CPU% of the whole machine from the cpu_times delta (proc.cpu_percent is per core)
+                cpu_percent = 0.0
+                if cpu_times:
+                    total = cpu_times.user + cpu_times.system
+                    prev_total, prev_time = prev_cpu_times.get(pid, (total, current_time))
+                    elapsed = current_time - prev_time
+                    if elapsed > 0:
+                        cpu_percent = max(0.0, (total - prev_total) / elapsed / ncpu * 100)
+                    prev_cpu_times[pid] = (total, current_time)
+
+                pids.append(pid)
+                names.append(name)
+                states.append(state)
+                cpu_percents.append(cpu_percent)
+                rss_bytes.append(rss)
+                start_times.append(create_time)
+
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                procs.pop(pid, None)
+                continue
+            except Exception:
+                continue
+
+        if unresolved:
+            # Expensive fallback for stubborn system processes: one tasklist snapshot for all of them
+            found = self._tasklist_names()
+            for i, pid in enumerate(pids):
+                if pid in unresolved and found.get(pid):
+                    names[i] = sys.intern(found[pid])
+                    proc, _, create_time = pid_meta[pid]
+                    pid_meta[pid] = (proc, names[i], create_time)
+
+        return build_columns(pids, names, states, cpu_percents, rss_bytes, start_times)
+
+    def _collect_data_linux(self, current_time):
+        """
+        Linux fast path: scan /proc and parse /proc/<pid>/stat directly.
+        Stat descriptors stay open between passes, so a known process costs a
+        single pread() syscall and no psutil.Process objects.
+        """
+        pids, names, states, cpu_percents, rss_bytes, start_times = [], [], [], [], [], []
+        prev_cpu_times = self._prev_cpu_times
+        clk_tck = self._clk_tck
+        # Clock ticks per second of wall time -> percent of total machine capacity
+        ticks_to_percent = 100 / (clk_tck * self._ncpu)
+        page_size = self._page_size
+        boot_time = self._boot_time
+        stat_fds = self._stat_fds
+        max_stat_fds = self._max_stat_fds
+        pid_meta = self._pid_meta_cache
+
+        # One getdents pass over /proc; listdir returns plain strings (no DirEntry objects)
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            data = None
+            fd = stat_fds.get(pid)
+            if fd is not None:
+                try:
+                    data = os.pread(fd, 4096, 0)
+                except OSError:
+                    # The process behind this descriptor exited (the PID may have been reused)
+                    os.close(fd)
+                    del stat_fds[pid]
+            if data is None:
+                try:
+                    fd = os.open(f'/proc/{pid}/stat', os.O_RDONLY)
+                except OSError:
+                    # Process exited between the directory scan and the open
                     continue
-                except Exception:
+                try:
+                    data = os.pread(fd, 4096, 0)
+                except OSError:
+                    os.close(fd)
                     continue
+                if len(stat_fds) < max_stat_fds:
+                    stat_fds[pid] = fd
+                else:
+                    os.close(fd)
+
+            # comm may contain spaces and parentheses: it ends at the last ')'
+            rparen = data.rfind(b')')
+            if rparen < 0:
+                continue
+            # Only the first 22 fields after comm are used (state .. rss); leave the tail unsplit
+            fields = data[rparen + 2:].split(None, 22)
+            try:
+                state = LINUX_PROC_STATES.get(fields[0], "unknown")
+                ticks = int(fields[11]) + int(fields[12])
+                rss = int(fields[21]) * page_size
+                starttime = fields[19]
+
+                # The raw starttime field identifies the process: a reused PID gets a new one
+                meta = pid_meta.get(pid)
+                if meta is not None and meta[0] == starttime:
+                    name, create_time = meta[1], meta[2]
+                else:
+                    prev_cpu_times.pop(pid, None)
+                    name = data[data.find(b'(') + 1:rparen].decode(errors='replace')
+                    if len(name) >= 15:
+                        # The kernel truncates comm to 15 chars; recover the full name like psutil does
+                        name = self._linux_full_name(pid, name)
+                    name = sys.intern(name or "Unknown")
+                    # From the stat buffer (/proc/<pid>'s ctime dates from the inode's first lookup, not the start)
+                    create_time = boot_time + int(starttime) / clk_tck
+                    pid_meta[pid] = (starttime, name, create_time)
+            except (IndexError, ValueError):
+                continue
+
+            cpu_percent = 0.0
+            prev_ticks, prev_time = prev_cpu_times.get(pid, (ticks, current_time))
+            elapsed = current_time - prev_time
+            if elapsed > 0:
+                cpu_percent = max(0.0, (ticks - prev_ticks) / elapsed * ticks_to_percent)
+            prev_cpu_times[pid] = (ticks, current_time)
 
-            self.processes = processes
-            self._cached_result = processes
-            self._cache_timestamp = current_time
-            
-            if update_cpu:
-                self.last_cpu_update = current_time
-                # Clean up stale CPU cache entries periodically
-                if len(self.cpu_data_cache) > 500:
-                    active_pids = {p['pid'] for p in processes}
-                    self.cpu_data_cache = {k: v for k, v in self.cpu_data_cache.items() if k in active_pids}
-                
-                # Clean up name cache periodically
-                if len(self.name_cache) > 200:
-                    active_pids = {p['pid'] for p in processes}
-                    self.name_cache = {k: v for k, v in self.name_cache.items() if k in active_pids}
-                    
-        finally:
-            self.is_collecting = False
\ No newline at end of file
+            pids.append(pid)
+            names.append(name)
+            states.append(state)
+            cpu_percents.append(cpu_percent)
+            rss_bytes.append(rss)
+            start_times.append(create_time)
+
+        return build_columns(pids, names, states, cpu_percents, rss_bytes, start_times)
+
+    def _linux_full_name(self, pid, comm):
+        """Expand a truncated comm using the executable name from /proc/<pid>/cmdline."""
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                argv0 = f.read().split(b'\0', 1)[0]
+        except OSError:
+            return comm
+        exe = os.path.basename(argv0.decode(errors='replace'))
+        return exe if exe.startswith(comm) else comm
+
+    def _tasklist_names(self):
+        """Map PID -> image name from a single tasklist snapshot (Windows fallback)."""
+        try:
+            # Fallback to tasklist for stubborn Windows processes (e.g. Secure System)
+            # usage of creationflags=0x08000000 (CREATE_NO_WINDOW) prevents console window flash
+            result = subprocess.run(['tasklist', '/NH', '/FO', 'CSV'], capture_output=True, creationflags=0x08000000)
+        except Exception:
+            return {}
+        # tasklist writes in the console (OEM) code page; decoding with it keeps non-ASCII names intact
+        output = result.stdout.decode('oem', errors='replace')
+        # Rows look like: "Image Name","PID","Session Name","Session#","Mem Usage"
+        return {int(row[1]): row[0] for row in csv.reader(io.StringIO(output)) if len(row) > 1 and row[1].isdigit()}
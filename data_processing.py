@@ -1,32 +1,64 @@
-import pandas as pd
+import functools
+import numpy as np
 import psutil
 import time
 
+@functools.lru_cache(maxsize=8192)
+def _format_seconds(seconds):
+    """Duration string for a whole, non-negative number of seconds (cached per value)."""
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes}m {seconds}s"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
 def format_duration(seconds):
     if seconds < 0:
         return "0s"
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    seconds = int(seconds % 60)
-    parts = []
-    if hours > 0:
-        parts.append(f"{hours}h")
-    if minutes > 0 or hours > 0:
-        parts.append(f"{minutes}m")
-    parts.append(f"{seconds}s")
-    return " ".join(parts)
+    return _format_seconds(int(seconds))
+
+def format_durations(start_times, current_time):
+    """Vectorized format_duration over a start_time column ('N/A' where the start time is unknown)."""
+    valid = start_times > 1000
+    seconds = np.where(valid, current_time - start_times, 0).astype(np.int64)
+    np.maximum(seconds, 0, out=seconds)
+    # Whole seconds repeat across rows and refreshes, so most strings come from the cache
+    durations = np.array([_format_seconds(s) for s in seconds.tolist()], dtype=object)
+    durations[~valid] = "N/A"
+    return durations
+
+# Columns of the processed table, in display order
+TABLE_COLUMNS = ('pid', 'name', 'state', 'cpu_percent', 'memory_mb', 'duration')
 
 def process_data(raw_data):
-    if not raw_data:
-        return pd.DataFrame(columns=['pid', 'name', 'state', 'cpu_percent', 'memory_mb', 'duration'])
-    df = pd.DataFrame(raw_data)
-    if not df.empty:
-        current_time = time.time()
-        df['duration'] = df['start_time'].apply(lambda x: format_duration(current_time - x) if x > 1000 else "N/A")
-        df['cpu_percent'] = df['cpu_percent'].round(2)
-        df['memory_mb'] = df['memory_mb'].round(2)
-        df = df.drop(columns=['start_time'])
-    return df
+    """
+    Return the table's columns (dict of numpy arrays): the collector's snapshot as-is,
+    or empty columns when there is none yet. The duration column is added per page
+    by page_durations.
+    """
+    if raw_data is None or len(raw_data['pid']) == 0:
+        return {
+            'pid': np.array([], dtype=np.int32),
+            'name': np.array([], dtype=object),
+            'state': np.array([], dtype=object),
+            'state_code': np.array([], dtype=np.int8),
+            'cpu_percent': np.array([], dtype=np.float64),
+            'memory_mb': np.array([], dtype=np.float64),
+            'start_time': np.array([], dtype=np.float64),
+        }
+    # build_columns rounds CPU% and memory to two decimals in place: the columns pass straight through
+    return raw_data
+
+def page_durations(page_data):
+    """Add the formatted duration column to a page of rows taken with select_rows."""
+    page_data['duration'] = format_durations(page_data['start_time'], time.time())
+    return page_data
+
+def select_rows(data, index):
+    """Apply a slice or boolean mask to every column of a processed table."""
+    return {column: values[index] for column, values in data.items()}
 
 def terminate_process(pid):
     try: